@@ -0,0 +1,195 @@
+import argparse
+import io
+import time
+from contextlib import redirect_stdout
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import dataset
+from tradebot import STRATEGIES, AtrSizing, Bot, cash_currency, load_strategy, stacks_value
+
+
+class BacktestResult(NamedTuple):
+    final_value: float
+    stacks: Dict[str, float]
+    trades: int
+    rejected: int
+    drawdown: float
+    candles: int
+    seconds: float
+
+
+def load_dataset(path: str) -> Tuple[List[str], List[str]]:
+    # CSVs go through the memory-mapped binary cache, converted on first use.
+    return dataset.to_rows(dataset.load(path))
+
+
+def load_bot(strategy: str, sizing: Optional[AtrSizing] = None, **params) -> Bot:
+    instance = load_strategy(strategy)(**params)
+    if sizing is not None:
+        instance.sizing = sizing
+    return Bot(instance)
+
+
+class Backtest:
+    # Replays a training CSV through the engine protocol against a bot running
+    # in this process (anything with a parse method will do), and executes its
+    # orders like the engine does: buys cost amount * close, sells pay
+    # amount * close, and the fee is taken from what is received. Orders the
+    # stacks cannot cover are rejected.
+    def __init__(self, format: List[str], rows: List[str], candles_given: int = 336,
+                 initial_stack: int = 1000, fee_percent: float = 0.2,
+                 timebank: int = 10000, time_per_move: int = 100, candle_interval: int = 1800):
+        self.format = format
+        self.candles_given = candles_given
+        self.initial_stack = initial_stack
+        self.fee = fee_percent / 100
+        self.timebank = timebank
+        self.time_per_move = time_per_move
+        self.candle_interval = candle_interval
+        self.turns = self.group_by_date(rows)
+        self.cash = cash_currency(self.turns[0][1]) if self.turns else None
+
+    def group_by_date(self, rows: List[str]) -> List[Tuple[List[str], Dict[str, float]]]:
+        pair_index = self.format.index("pair")
+        date_index = self.format.index("date")
+        close_index = self.format.index("close")
+        turns = []
+        last_date = None
+        for row in rows:
+            fields = row.split(",")
+            if fields[date_index] != last_date:
+                turns.append(([], {}))
+                last_date = fields[date_index]
+            turns[-1][0].append(row)
+            turns[-1][1][fields[pair_index]] = float(fields[close_index])
+        return turns
+
+    def settings(self) -> List[str]:
+        return [
+            f"settings timebank {self.timebank}",
+            f"settings time_per_move {self.time_per_move}",
+            f"settings candle_interval {self.candle_interval}",
+            f"settings candle_format {','.join(self.format)}",
+            f"settings candles_total {len(self.turns)}",
+            f"settings candles_given {self.candles_given}",
+            f"settings initial_stack {self.initial_stack}",
+            f"settings transaction_fee_percent {self.fee * 100}",
+        ]
+
+    def initial_stacks(self) -> Dict[str, float]:
+        # Only the cash currency is funded, like the engine does.
+        stacks = {}
+        for pair in self.turns[0][1]:
+            for currency in pair.split("_"):
+                stacks[currency] = 0.0
+        stacks[self.cash] = float(self.initial_stack)
+        return stacks
+
+    def execute(self, order: str, stacks: Dict[str, float], closes: Dict[str, float]) -> bool:
+        action, pair, amount = order.split(" ")
+        amount = float(amount)
+        base, quote = pair.split("_")
+        price = closes[pair]
+        if amount <= 0:
+            return False
+        if action == "buy":
+            cost = amount * price
+            if cost > stacks[base]:
+                return False
+            stacks[base] -= cost
+            stacks[quote] += amount * (1 - self.fee)
+            return True
+        if action == "sell":
+            if amount > stacks[quote]:
+                return False
+            stacks[quote] -= amount
+            stacks[base] += amount * price * (1 - self.fee)
+            return True
+        return False
+
+    def value(self, stacks: Dict[str, float], closes: Dict[str, float]) -> float:
+        return stacks_value(stacks, closes, self.cash)
+
+    def run(self, bot: Bot) -> BacktestResult:
+        started = time.perf_counter()
+        first = max(1, min(self.candles_given, len(self.turns)))
+        self.start(bot, first)
+        result = self.trade(bot, first - 1, len(self.turns))
+        return result._replace(candles=len(self.turns), seconds=time.perf_counter() - started)
+
+    def start(self, bot: Bot, given: int):
+        for line in self.settings():
+            bot.parse(line)
+        self.feed(bot, 0, given)
+
+    def feed(self, bot: Bot, start: int, end: int):
+        # Candles of turns [start, end) in a single update, without actions.
+        rows = [row for rows, _ in self.turns[start:end] for row in rows]
+        if rows:
+            bot.parse("update game next_candles " + ";".join(rows))
+
+    def closes_at(self, turn: int) -> Dict[str, float]:
+        closes = {}
+        for _, turn_closes in self.turns[:turn + 1]:
+            closes.update(turn_closes)
+        return closes
+
+    def trade(self, bot: Bot, start: int, end: int) -> BacktestResult:
+        # Trades turns [start, end) from the initial stacks. The bot must
+        # already hold the candles up to and including turn `start`.
+        started = time.perf_counter()
+        stacks = self.initial_stacks()
+        closes = self.closes_at(start)
+        trades = rejected = 0
+        peak = drawdown = 0.0
+        output = io.StringIO()
+        for turn in range(start, end):
+            if turn > start:
+                rows, turn_closes = self.turns[turn]
+                bot.parse("update game next_candles " + ";".join(rows))
+                closes.update(turn_closes)
+            equity = self.value(stacks, closes)
+            peak = max(peak, equity)
+            drawdown = max(drawdown, 1 - equity / peak)
+            bot.parse("update game stacks " + ",".join(f"{key}:{value:.8f}" for key, value in stacks.items()))
+
+            output.seek(0)
+            output.truncate()
+            with redirect_stdout(output):
+                bot.parse(f"action order {self.timebank}")
+            reply = output.getvalue().strip()
+            if not reply or reply == "no_moves":
+                continue
+            for order in reply.splitlines()[-1].split(";"):
+                if self.execute(order.strip(), stacks, closes):
+                    trades += 1
+                else:
+                    rejected += 1
+
+        equity = self.value(stacks, closes)
+        drawdown = max(drawdown, 1 - equity / max(peak, equity))
+        return BacktestResult(equity, stacks, trades, rejected, drawdown,
+                              end - start, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a training dataset through a bot without the engine.")
+    parser.add_argument("dataset", nargs="+", help="training CSV or .npy file(s)")
+    parser.add_argument("--strategy", default="bollinger",
+                        help="strategy name (%s) or module:Class" % ", ".join(sorted(STRATEGIES)))
+    parser.add_argument("--given", type=int, default=336, help="candles given before the first action")
+    parser.add_argument("--stack", type=int, default=1000, help="initial stack in the base currency")
+    parser.add_argument("--fee", type=float, default=0.2, help="transaction fee percent")
+    parser.add_argument("--risk", type=float, help="size orders by ATR, risking this share of the equity per order")
+    args = parser.parse_args()
+
+    for path in args.dataset:
+        format, rows = load_dataset(path)
+        backtest = Backtest(format, rows, args.given, args.stack, args.fee)
+        result = backtest.run(load_bot(args.strategy, AtrSizing(args.risk) if args.risk else None))
+        print(f"{path}: value {result.final_value:.2f} trades {result.trades} rejected {result.rejected} "
+              f"drawdown {result.drawdown:.1%} ({result.candles / result.seconds:.0f} candles/s)")
+
+
+if __name__ == "__main__":
+    main()
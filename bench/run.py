@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from tradebot import Bot, BotState, Chart, load_strategy
+
+FORMAT = ["pair", "date", "high", "low", "open", "close", "volume"]
+TIME_PER_MOVE = 100
+
+
+def synthetic_rows(candles: int, pairs: List[str], seed: int = 0) -> List[List[str]]:
+    # One list of rows per turn: a random walk per pair, 30 minutes apart.
+    rng = random.Random(seed)
+    prices = {pair: 100.0 * (i + 1) for i, pair in enumerate(pairs)}
+    turns = []
+    for i in range(candles):
+        date = 1577836800 + i * 1800
+        rows = []
+        for pair in pairs:
+            open = prices[pair]
+            close = open * (1 + rng.gauss(0, 0.01))
+            high = max(open, close) * (1 + abs(rng.gauss(0, 0.003)))
+            low = min(open, close) * (1 - abs(rng.gauss(0, 0.003)))
+            prices[pair] = close
+            rows.append(f"{pair},{date},{high:.8f},{low:.8f},{open:.8f},{close:.8f},{rng.uniform(1, 100):.8f}")
+        turns.append(rows)
+    return turns
+
+
+def protocol_stream(turns: List[List[str]], given: int = 336) -> List[str]:
+    # Engine lines for a whole match; stacks stay at the initial stack since
+    # no orders are executed.
+    given = max(1, min(given, len(turns)))
+    currencies = sorted({currency for row in turns[0] for currency in row.split(",")[0].split("_")})
+    stacks = "update game stacks " + ",".join(f"{currency}:1000.00" for currency in currencies)
+    lines = [
+        "settings timebank 10000",
+        f"settings time_per_move {TIME_PER_MOVE}",
+        "settings candle_interval 1800",
+        f"settings candle_format {','.join(FORMAT)}",
+        f"settings candles_total {len(turns)}",
+        f"settings candles_given {given}",
+        "settings initial_stack 1000",
+        "settings transaction_fee_percent 0.2",
+        "update game next_candles " + ";".join(row for rows in turns[:given] for row in rows),
+        stacks,
+        "action order 10000",
+    ]
+    for rows in turns[given:]:
+        lines += ["update game next_candles " + ";".join(rows), stacks, "action order 10000"]
+    return lines
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def summary(name: str, candles: int, samples: List[float], seconds: float) -> Dict:
+    # Samples are in seconds, latencies are reported in microseconds.
+    return {
+        "name": name,
+        "candles": candles,
+        "count": len(samples),
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p90_us": percentile(samples, 90) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+        "max_us": max(samples) * 1e6,
+        "candles_per_s": candles / seconds if seconds else 0.0,
+    }
+
+
+def bench_parse(strategy: str, turns: List[List[str]]) -> List[Dict]:
+    # Whole protocol replay through Bot.parse, timed per line kind.
+    bot = Bot(load_strategy(strategy)())
+    samples = {"parse.next_candles": [], "parse.stacks": [], "parse.action": []}
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for line in protocol_stream(turns):
+            tmp = line.split(" ", 3)
+            kind = samples.get("parse." + (tmp[2] if tmp[0] == "update" else tmp[0]))
+            before = time.perf_counter()
+            bot.parse(line)
+            if kind is not None:
+                kind.append(time.perf_counter() - before)
+    seconds = time.perf_counter() - started
+    return [summary(name, len(turns), values, seconds) for name, values in samples.items()]
+
+
+def bench_update_game(turns: List[List[str]]) -> List[Dict]:
+    botState = BotState()
+    botState.update_settings("candle_format", ",".join(FORMAT))
+    botState.update_settings("candles_total", str(len(turns)))
+    payloads = [";".join(rows) for rows in turns]
+    samples = []
+    started = time.perf_counter()
+    for payload in payloads:
+        before = time.perf_counter()
+        botState.update_game("next_candles", payload)
+        botState.update_indicators()
+        samples.append(time.perf_counter() - before)
+    return [summary("update_game", len(turns), samples, time.perf_counter() - started)]
+
+
+def bench_indicator(name: str, turns: List[List[str]], query: Callable[[Chart], object]) -> List[Dict]:
+    # A candle is added to the chart and the indicator queried, as a strategy
+    # does on every action.
+    chart = Chart(len(turns))
+    rows = [[float(value) for value in rows[0].split(",")[1:]] for rows in turns]
+    samples = []
+    started = time.perf_counter()
+    for date, high, low, open, close, volume in rows:
+        before = time.perf_counter()
+        chart.add_row(int(date), open, high, low, close, volume)
+        query(chart)
+        samples.append(time.perf_counter() - before)
+    return [summary(name, len(turns), samples, time.perf_counter() - started)]
+
+
+def run(sizes: List[int], strategy: str, pairs: List[str], seed: int) -> List[Dict]:
+    bollinger = load_strategy("bollinger")()
+    rsi = BotState()
+
+    def query_rsi(chart: Chart) -> bool:
+        rsi.charts["USDT_BTC"] = chart
+        return rsi.Rsi("USDT_BTC", 5)
+
+    results = []
+    for candles in sizes:
+        turns = synthetic_rows(candles, pairs, seed)
+        results += bench_parse(strategy, turns)
+        results += bench_update_game(turns)
+        results += bench_indicator("calculate_ema", turns, lambda chart: chart.calculate_ema(20))
+        results += bench_indicator("calculate_bollinger_bands", turns, bollinger.calculate_bollinger_bands)
+        results += bench_indicator("rsi", turns, query_rsi)
+        results += bench_indicator("donchian", turns, lambda chart: chart.add_indicator("donchian", 20).upper)
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[str]:
+    # Names of the benchmarks whose p99 grew by more than `threshold` times.
+    previous = {(row["name"], row["candles"]): row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        old = previous.get((row["name"], row["candles"]))
+        if old is None or old["p99_us"] == 0:
+            continue
+        ratio = row["p99_us"] / old["p99_us"]
+        print(f"{row['name']:28} {row['candles']:>7} p99 {old['p99_us']:10.1f} -> {row['p99_us']:10.1f} us ({ratio:.2f}x)")
+        if ratio > threshold:
+            regressions.append(f"{row['name']}/{row['candles']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the protocol and indicator hot paths on synthetic matches.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="candles per match")
+    parser.add_argument("--strategy", default="bollinger", help="strategy replayed by the parse benchmark")
+    parser.add_argument("--pairs", nargs="+", default=["USDT_BTC"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--compare", help="earlier JSON results to compare p99 latencies with")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p99 growth counted as a regression")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.strategy, args.pairs, args.seed)
+    print(f"{'benchmark':28} {'candles':>7} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10} {'max us':>10} {'candles/s':>12}")
+    for row in results:
+        print(f"{row['name']:28} {row['candles']:>7} {row['p50_us']:10.1f} {row['p90_us']:10.1f} {row['p99_us']:10.1f} "
+              f"{row['max_us']:10.1f} {row['candles_per_s']:12.0f}")
+
+    # The engine answer has to fit in time_per_move once the bank is spent.
+    slowest = max(row["max_us"] for row in results if row["name"] == "parse.action") / 1000
+    print(f"slowest action {slowest:.2f} ms of the {TIME_PER_MOVE} ms time_per_move")
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "strategy": args.strategy,
+            "pairs": args.pairs,
+            "seed": args.seed,
+            "results": results,
+        }, f, indent=2)
+    print(f"results in {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("regressions: " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
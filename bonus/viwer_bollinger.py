@@ -1,10 +1,15 @@
+import os
+import sys
 import pandas as pd
 import mplfinance as mpf
 from typing import List, Tuple
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import dataset
+
 
 # Read data from CSV file
-data = pd.read_csv('trade_training-datasets/training-set_USDT_BTC-3.csv')
+data = pd.DataFrame(dataset.load('trade_training-datasets/training-set_USDT_BTC-3.csv'))
 
 # Convert the 'date' column to pandas DateTime format
 data['date'] = pd.to_datetime(data['date'])
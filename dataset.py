@@ -0,0 +1,93 @@
+import argparse
+import hashlib
+import json
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+# One record per candle, in the column order of the training CSVs.
+DTYPE = np.dtype([
+    ("pair", "S16"),
+    ("date", "i8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("open", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_paths(path: str) -> Tuple[str, str]:
+    folder = os.path.join(os.path.dirname(path), ".cache")
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(folder, stem + ".npy"), os.path.join(folder, stem + ".json")
+
+
+def read_csv(path: str) -> np.ndarray:
+    with open(path) as f:
+        format = f.readline().strip().split(",")
+    parsed = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=1,
+                        dtype=np.dtype([(key, DTYPE[key]) for key in format]))
+    records = np.zeros(len(parsed), dtype=DTYPE)
+    for key in format:
+        records[key] = parsed[key]
+    return records
+
+
+def convert(path: str) -> str:
+    binary, meta = cache_paths(path)
+    os.makedirs(os.path.dirname(binary), exist_ok=True)
+    np.save(binary, read_csv(path))
+    stat = os.stat(path)
+    with open(meta, "w") as f:
+        json.dump({"sha256": file_hash(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, f)
+    return binary
+
+
+def load(path: str) -> np.ndarray:
+    # Returns a read-only memory map of the dataset. A CSV is converted on
+    # first use and its cache is reused while the source content hash matches;
+    # size and mtime are checked first so an unchanged file is not re-hashed.
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    binary, meta = cache_paths(path)
+    if os.path.exists(binary) and os.path.exists(meta):
+        with open(meta) as f:
+            recorded = json.load(f)
+        stat = os.stat(path)
+        if (recorded["size"], recorded["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return np.load(binary, mmap_mode="r")
+        if recorded["size"] == stat.st_size and recorded["sha256"] == file_hash(path):
+            recorded["mtime_ns"] = stat.st_mtime_ns
+            with open(meta, "w") as f:
+                json.dump(recorded, f)
+            return np.load(binary, mmap_mode="r")
+    return np.load(convert(path), mmap_mode="r")
+
+
+def to_rows(records: np.ndarray) -> Tuple[List[str], List[str]]:
+    # Candle format and protocol rows, as backtest.load_dataset returns them.
+    format = list(DTYPE.names)
+    columns = [records["pair"].astype(str)] + [records[key].tolist() for key in format[1:]]
+    return format, [",".join(map(str, row)) for row in zip(*columns)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert training CSVs to the cached binary format.")
+    parser.add_argument("dataset", nargs="+", help="training CSV file(s)")
+    args = parser.parse_args()
+    for path in args.dataset:
+        print(f"{path} -> {convert(path)}")
+
+
+if __name__ == "__main__":
+    main()
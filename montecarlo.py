@@ -0,0 +1,90 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import dataset
+from backtest import Backtest, load_bot
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "trade_training-datasets"))
+import set_generator
+
+
+def evaluate(strategy: str, params: Dict[str, float], seed: int, candles: int, pairs: List[str], regime: str,
+             given: int, stack: float, fee: float) -> Tuple[float, float, int]:
+    # Each worker generates its own path from the seed, so only the seed and
+    # the three result numbers cross the process boundary.
+    format, rows = dataset.to_rows(set_generator.generate(candles, pairs, seed, regime))
+    result = Backtest(format, rows, given, stack, fee).run(load_bot(strategy, **params))
+    return result.final_value, result.drawdown, result.trades
+
+
+def evaluate_batch(args: Tuple) -> List[Tuple[float, float, int]]:
+    strategy, params, seeds, candles, pairs, regime, given, stack, fee = args
+    return [evaluate(strategy, params, seed, candles, pairs, regime, given, stack, fee) for seed in seeds]
+
+
+def distribution(values: np.ndarray) -> str:
+    p5, p25, p50, p75, p95 = np.percentile(values, (5, 25, 50, 75, 95))
+    return (f"mean {values.mean():8.2f} std {values.std():7.2f} | p5 {p5:8.2f} p25 {p25:8.2f} "
+            f"p50 {p50:8.2f} p75 {p75:8.2f} p95 {p95:8.2f}")
+
+
+def parse_param(text: str) -> Tuple[str, float]:
+    key, _, value = text.partition("=")
+    return key, json.loads(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest a strategy on many generated price paths in parallel.")
+    parser.add_argument("--strategy", default="bollinger", help="strategy name or module:Class")
+    parser.add_argument("--param", type=parse_param, action="append", default=[], metavar="KEY=VALUE",
+                        help="strategy constructor argument, e.g. long_period=30")
+    parser.add_argument("--paths", type=int, default=1000)
+    parser.add_argument("--candles", type=int, default=720, help="candles per path and pair")
+    parser.add_argument("--pairs", nargs="+", default=["USDT_BTC"])
+    parser.add_argument("--regime", choices=sorted(set_generator.REGIMES), default="default")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first path, the others follow")
+    parser.add_argument("--given", type=int, default=336, help="candles given before the first action")
+    parser.add_argument("--stack", type=int, default=1000, help="initial stack in the base currency")
+    parser.add_argument("--fee", type=float, default=0.2, help="transaction fee percent")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", help="per-path results CSV")
+    args = parser.parse_args()
+
+    params = dict(args.param)
+    seeds = list(range(args.seed, args.seed + args.paths))
+    # A few batches per worker keep the pool busy without a round trip per path.
+    size = max(1, len(seeds) // (4 * args.workers))
+    batches = [(args.strategy, params, seeds[i:i + size], args.candles, args.pairs, args.regime, args.given,
+                args.stack, args.fee) for i in range(0, len(seeds), size)]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        results = [result for batch in pool.map(evaluate_batch, batches) for result in batch]
+    elapsed = time.perf_counter() - started
+
+    values, drawdowns, trades = (np.array(column) for column in zip(*results))
+    returns = (values / args.stack - 1) * 100
+    print(f"{args.paths} paths of {args.candles} candles ({args.regime}) for {args.strategy} {params} in {elapsed:.1f}s")
+    print(f"return %   {distribution(returns)}")
+    print(f"drawdown % {distribution(drawdowns * 100)}")
+    print(f"trades     {distribution(trades)}")
+    print(f"losing paths {np.mean(returns < 0):.1%}")
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["seed", "final_value", "return_percent", "drawdown_percent", "trades"])
+            for seed, value, ret, drawdown, count in zip(seeds, values, returns, drawdowns, trades):
+                writer.writerow([seed, f"{value:.2f}", f"{ret:.2f}", f"{drawdown * 100:.2f}", count])
+
+
+if __name__ == "__main__":
+    main()
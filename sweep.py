@@ -0,0 +1,247 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import dataset
+from backtest import Backtest, load_bot
+from tradebot import Bot, Chart, Indicator, SharedBollingerBands, SharedMacd, load_strategy
+
+# Parameters each strategy accepts, with the values swept by default.
+SPACES = {
+    "bollinger": {
+        "long_period": list(range(10, 61, 5)),
+        "std_multiplier": [1.0, 1.5, 2.0, 2.5, 3.0],
+    },
+    "bollinger_macd": {
+        "long_period": list(range(10, 61, 10)),
+        "std_multiplier": [1.5, 2.0, 2.5],
+        "macd_fast_period": [8, 12, 16],
+        "macd_slow_period": [21, 26, 34],
+        "macd_signal_period": [5, 9, 13],
+        "bands": ["first", "rolling"],
+    },
+}
+
+attached = []
+backtests = {}
+cubes = {}
+
+
+def grid(space: Dict[str, list]) -> List[Dict[str, float]]:
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def cube_keys(spec: Tuple) -> List[Tuple]:
+    # Precomputed series an indicator spec reads; the band multiplier does
+    # not change the rolling mean and std, so variants share them.
+    if spec[0] == "bollinger":
+        return [("mean", spec[1]), ("std", spec[1])]
+    if spec[0] == "macd":
+        return [("histogram",) + spec[1:]]
+    return []
+
+
+def ema_rows(inputs: np.ndarray, begins: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    # EMAs of many rows in a single pass over time. Row r is the EMA of
+    # inputs[r] from index begins[r] on, seeded like Ema with the mean of its
+    # first periods[r] inputs, then advanced with the same arithmetic, so the
+    # values match the streaming indicator exactly. NaN until seeded.
+    rows, candles = inputs.shape
+    seeded = begins + periods - 1
+    seeds = np.full(rows, np.nan)
+    for row in range(rows):
+        if seeded[row] < candles:
+            seeds[row] = np.cumsum(inputs[row, begins[row]:seeded[row] + 1])[-1] / periods[row]
+    multipliers = 2 / (periods + 1)
+    out = np.full((rows, candles), np.nan)
+    previous = np.full(rows, np.nan)
+    for index in range(candles):
+        current = (inputs[:, index] - previous) * multipliers + previous
+        starting = seeded == index
+        current[starting] = seeds[starting]
+        out[:, index] = current
+        previous = current
+    return out
+
+
+def compute_cube(closes: np.ndarray, keys: List[Tuple]) -> Dict[Tuple, Tuple[np.ndarray, int]]:
+    # Every series needed by the swept variants, computed once per dataset
+    # and aligned with the candles, each paired with its first valid index:
+    # - rolling means and stds of every period from one pair of cumulative
+    #   sums (the same arithmetic as vector_backtest.rolling_mean_std);
+    # - every fast and slow EMA in one period x time pass, the MACD lines
+    #   as their differences, and every signal EMA in a second pass over
+    #   the MACD lines.
+    series = {}
+    candles = len(closes)
+    shifted = closes - closes[0]
+    sums = np.concatenate(([0.0], np.cumsum(shifted)))
+    squares = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+    for period in sorted({key[1] for key in keys if key[0] in ("mean", "std")}):
+        mean = np.full(candles, np.nan)
+        std = np.full(candles, np.nan)
+        window_mean = (sums[period:] - sums[:-period]) / period
+        variance = (squares[period:] - squares[:-period]) / period - window_mean ** 2
+        mean[period - 1:] = window_mean + closes[0]
+        std[period - 1:] = np.sqrt(np.maximum(variance, 0.0))
+        series[("mean", period)] = (mean, 0)
+        series[("std", period)] = (std, 0)
+
+    macds = [key for key in keys if key[0] == "histogram"]
+    if not macds:
+        return series
+    periods = sorted({period for key in macds for period in key[1:3]})
+    emas = ema_rows(np.broadcast_to(closes, (len(periods), candles)), np.zeros(len(periods), dtype=int),
+                    np.array(periods))
+    ema = {period: emas[row] for row, period in enumerate(periods)}
+    # Like Macd, a line starts once the slow EMA is ready.
+    lines = np.array([ema[fast] - ema[slow] for _, fast, slow, _ in macds])
+    begins = np.array([slow - 1 for _, _, slow, _ in macds])
+    signals = ema_rows(lines, begins, np.array([signal for _, _, _, signal in macds]))
+    for row, key in enumerate(macds):
+        first = min(begins[row] + key[3] - 1, candles)
+        histogram = np.full(candles, np.nan)
+        histogram[first:] = lines[row, first:] - signals[row, first:]
+        series[key] = (histogram, first)
+    return series
+
+
+def share_cubes(paths: List[str], jobs: List[Tuple[str, Dict[str, float]]]) -> Tuple[List[SharedMemory], Dict]:
+    # One shared block per dataset holds the series of all its pairs. The
+    # layout maps pair and key to (offset, length, first) in doubles.
+    specs = {spec for strategy, params in jobs for spec in load_strategy(strategy)(**params).indicators}
+    keys = sorted({key for spec in specs for key in cube_keys(spec)}, key=str)
+    blocks, layouts = [], {}
+    for path in paths:
+        records = dataset.load(path)
+        pairs = {pair.decode(): np.ascontiguousarray(records["close"][records["pair"] == pair])
+                 for pair in np.unique(records["pair"])}
+        cube = {pair: compute_cube(closes, keys) for pair, closes in pairs.items()}
+        total = sum(len(values) for series in cube.values() for values, _ in series.values())
+        block = SharedMemory(create=True, size=max(8, total * 8))
+        buffer = np.ndarray(total, dtype=np.float64, buffer=block.buf)
+        layout, offset = {}, 0
+        for pair, series in cube.items():
+            layout[pair] = {}
+            for key, (values, first) in series.items():
+                buffer[offset:offset + len(values)] = values
+                layout[pair][key] = (offset, len(values), first)
+                offset += len(values)
+        del buffer
+        blocks.append(block)
+        layouts[path] = (block.name, layout)
+    return blocks, layouts
+
+
+def shared_indicator(spec: Tuple, columns: Dict[Tuple, Tuple[memoryview, int]]) -> Optional[Indicator]:
+    if spec[0] == "bollinger":
+        return SharedBollingerBands(columns[("mean", spec[1])][0], columns[("std", spec[1])][0], spec[2])
+    if spec[0] == "macd":
+        return SharedMacd(*columns[("histogram",) + spec[1:]])
+    return None
+
+
+def install_cube(bot: Bot, path: str):
+    # Charts are created up front with the shared indicators in place, so the
+    # strategy's add_indicator calls find them and compute nothing.
+    for pair, columns in cubes[path].items():
+        chart = bot.botState.charts[pair] = Chart(len(next(iter(columns.values()))[0]) if columns else 0)
+        for spec in bot.strategy.indicators:
+            indicator = shared_indicator(spec, columns)
+            if indicator is None:
+                chart.add_indicator(*spec)
+            else:
+                chart.indicators[spec] = indicator
+
+
+def attach(layouts: Dict):
+    for path, (name, layout) in layouts.items():
+        block = SharedMemory(name=name)
+        attached.append(block)
+        cubes[path] = {pair: {key: (block.buf[offset * 8:(offset + length) * 8].cast("d"), first)
+                              for key, (offset, length, first) in series.items()}
+                       for pair, series in layout.items()}
+
+
+def evaluate(strategy: str, params: Dict[str, float], path: str, given: int, fee: float) -> Tuple[float, int]:
+    # Workers memory-map the binary cache the parent converted, so the page
+    # cache is shared and no worker parses the CSV text.
+    if path not in backtests:
+        format, rows = dataset.to_rows(dataset.load(path))
+        backtests[path] = Backtest(format, rows, given, fee_percent=fee)
+    bot = load_bot(strategy, **params)
+    if path in cubes:
+        install_cube(bot, path)
+    result = backtests[path].run(bot)
+    return result.final_value, result.trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over datasets in parallel.")
+    parser.add_argument("dataset", nargs="+", help="training CSV or .npy file(s)")
+    parser.add_argument("--strategy", action="append", choices=sorted(SPACES), help="strategies to sweep, default all")
+    parser.add_argument("--samples", type=int, default=0, help="random search over this many points per strategy")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--given", type=int, default=336, help="candles given before the first action")
+    parser.add_argument("--fee", type=float, default=0.2, help="transaction fee percent")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="sweep_results.csv", help="ranked results table")
+    parser.add_argument("--no-cube", action="store_true", help="compute indicators in every backtest instead")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    jobs = []
+    for strategy in args.strategy or sorted(SPACES):
+        points = grid(SPACES[strategy])
+        if args.samples:
+            points = rng.sample(points, min(args.samples, len(points)))
+        jobs += [(strategy, params) for params in points]
+
+    started = time.perf_counter()
+    # Converts each CSV to its binary cache once, before the workers open it.
+    for path in args.dataset:
+        dataset.load(path)
+    shared = []
+    try:
+        layouts = {}
+        if not args.no_cube:
+            shared, layouts = share_cubes(args.dataset, jobs)
+        with ProcessPoolExecutor(args.workers, initializer=attach, initargs=(layouts,)) as pool:
+            futures = {(i, path): pool.submit(evaluate, strategy, params, path, args.given, args.fee)
+                       for (i, (strategy, params)) in enumerate(jobs) for path in args.dataset}
+            results = {key: future.result() for key, future in futures.items()}
+    finally:
+        for block in shared:
+            block.close()
+            block.unlink()
+
+    table = []
+    for (i, (strategy, params)) in enumerate(jobs):
+        values = [results[(i, path)][0] for path in args.dataset]
+        trades = sum(results[(i, path)][1] for path in args.dataset)
+        table.append((sum(values) / len(values), strategy, params, values, trades))
+    table.sort(key=lambda row: row[0], reverse=True)
+
+    with open(args.output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "mean_value", "strategy", "params", "trades"] + args.dataset)
+        for (rank, (mean, strategy, params, values, trades)) in enumerate(table, 1):
+            writer.writerow([rank, f"{mean:.2f}", strategy, " ".join(f"{k}={v}" for k, v in params.items()), trades]
+                            + [f"{value:.2f}" for value in values])
+
+    print(f"{len(jobs) * len(args.dataset)} backtests in {time.perf_counter() - started:.1f}s, ranking in {args.output}")
+    for (rank, (mean, strategy, params, values, trades)) in enumerate(table[:10], 1):
+        print(f"{rank:3} {mean:10.2f} {strategy} {params}")
+
+
+if __name__ == "__main__":
+    main()
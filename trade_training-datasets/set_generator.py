@@ -1,52 +1,118 @@
 #!/usr/bin/env python3
+import argparse
 import os
-from math import cos,sin,sqrt
-from random import gauss,randint
-from numpy import linspace
-
-bruit = 2
-cycle = 15
-frequence = 30
-taille = 720
-tlen = 80
-tmax = 20
-tendance1,tendance2 = [],[]
-sign = 1
-while len(tendance1) <= taille:
-    tendance1 += list(linspace(tmax*(4+sign),tmax*(4-sign),tlen+randint(0,tlen/2)))
-    sign = -sign
-tendance1 = tendance1[:taille+1]
-while len(tendance2) <= taille:
-    tendance2 += list(linspace(tmax*(4+sign),tmax*(4-sign),tlen+randint(0,tlen/2)))
-    sign = -sign
-tendance2 = tendance2[:taille+1]
-
-gen1 = [sin(frequence*i/taille)*cycle+gauss(0,1)*bruit+tendance1[i] for i in range(taille)]
-gen1.insert(0,0)
-gen2 = [cos(frequence*i/taille)*cycle+gauss(0,1)*bruit+tendance2[i] for i in range(taille)]
-gen2.insert(0,0)
-
-f = open("training_set-template.csv","r")
-g = open("training_set-new_set.csv","w")
-for (i,ligne) in enumerate(f):
-    if len(ligne)<2 or ligne[0] == 'p':
-        g.write(ligne)
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import dataset
+
+# Price regimes: a zigzag trend between level - trend and level + trend whose
+# legs last trend_length candles (up to 50% longer), a sine cycle of
+# amplitude `cycle` and period `cycle_period` candles, and gaussian noise.
+REGIMES = {
+    "default": {"level": 80.0, "trend": 20.0, "trend_length": 80, "cycle": 15.0, "cycle_period": 150, "noise": 2.0},
+    "trending": {"level": 80.0, "trend": 35.0, "trend_length": 400, "cycle": 4.0, "cycle_period": 150, "noise": 1.0},
+    "ranging": {"level": 80.0, "trend": 2.0, "trend_length": 80, "cycle": 10.0, "cycle_period": 60, "noise": 1.0},
+    "volatile": {"level": 80.0, "trend": 20.0, "trend_length": 40, "cycle": 15.0, "cycle_period": 150, "noise": 6.0},
+}
+
+
+def trend(rng: np.random.Generator, candles: int, level: float, amplitude: float, length: int) -> np.ndarray:
+    legs = []
+    total = 0
+    while total < candles:
+        legs.append(length + int(rng.integers(0, length // 2 + 1)))
+        total += legs[-1]
+    knots = np.concatenate(([0], np.cumsum(legs)))
+    signs = np.where(np.arange(len(knots)) % 2 == 0, 1.0, -1.0) * rng.choice((-1.0, 1.0))
+    return np.interp(np.arange(candles), knots, level + amplitude * signs)
+
+
+def closes(rng: np.random.Generator, candles: int, level: float, trend_amplitude: float, trend_length: int,
+           cycle: float, cycle_period: int, noise: float) -> np.ndarray:
+    phase = rng.uniform(0, 2 * np.pi)
+    series = (trend(rng, candles, level, trend_amplitude, trend_length)
+              + cycle * np.sin(2 * np.pi * np.arange(candles) / cycle_period + phase)
+              + rng.normal(0, noise, candles))
+    # Keep prices positive whatever the regime parameters are.
+    return np.maximum(series, level * 0.01)
+
+
+def generate(candles: int, pairs: List[str], seed: int = 0, regime: str = "default", start: int = 1620550800,
+             interval: int = 1800, **overrides) -> np.ndarray:
+    # Records in dataset.DTYPE, one row per pair and candle, ordered by date
+    # like the engine sends them. Every pair gets its own trend, cycle phase
+    # and noise drawn from `seed`.
+    params = dict(REGIMES[regime], **{key: value for key, value in overrides.items() if value is not None})
+    rng = np.random.default_rng(seed)
+    records = np.zeros((candles, len(pairs)), dtype=dataset.DTYPE)
+    for column, pair in enumerate(pairs):
+        close = closes(rng, candles, params["level"], params["trend"], params["trend_length"],
+                       params["cycle"], params["cycle_period"], params["noise"])
+        open = np.concatenate(([close[0]], close[:-1]))
+        wick = np.abs(rng.normal(0, 0.005, (2, candles)))
+        records["pair"][:, column] = pair
+        records["open"][:, column] = open
+        records["close"][:, column] = close
+        records["high"][:, column] = np.maximum(open, close) * (1 + wick[0])
+        records["low"][:, column] = np.minimum(open, close) * (1 - wick[1])
+        records["volume"][:, column] = rng.lognormal(17, 0.5, candles)
+    records["date"] = (start + interval * np.arange(candles))[:, None]
+    return records.reshape(-1)
+
+
+def write_csv(records: np.ndarray, path: str, chunk: int = 1 << 18):
+    with open(path, "w") as f:
+        f.write(",".join(dataset.DTYPE.names) + "\n")
+        for first in range(0, len(records), chunk):
+            part = records[first:first + chunk]
+            columns = [part["pair"].astype(str).tolist()] + [part[key].tolist() for key in dataset.DTYPE.names[1:]]
+            f.writelines("%s,%d,%.8g,%.8g,%.8g,%.8g,%.8g\n" % row for row in zip(*columns))
+
+
+def write(records: np.ndarray, path: str):
+    # .npy files are memory-mapped as they are by dataset.load and the tools.
+    if path.endswith(".npy"):
+        np.save(path, records)
     else:
-        data = ligne.split(",")
-        if i in range(1,taille+1):
-            nvals = [gen1[i],gen1[i]*0.95,gen1[i]*(1-gauss(0.025,0.005)),gen1[i]*(1-gauss(0.025,0.005))]
-        if i in range(taille+1,2*taille+1):
-            nvals = [gen2[i-taille],gen2[i-taille]*0.95,gen2[i-taille]*(1-gauss(0.025,0.005)),gen2[i-taille]*(1-gauss(0.025,0.005))]
-        if i > 2*taille:
-            nvals = [gen2[i-2*taille]/gen1[i-2*taille],gen2[i-2*taille]/gen1[i-2*taille],gen2[i-2*taille]/gen1[i-2*taille]*(1-gauss(0.025,0.005)),gen2[i-2*taille]/gen1[i-2*taille]*(1-gauss(0.025,0.005))]
-        g.write(data[0]+","+data[1]+",")
-        g.write(",".join([str(x) for x in nvals]))
-        g.write(","+data[6])
-f.close()
-g.close()
-
-from matplotlib import pyplot as plt
-x = linspace(1,taille,taille)
-plt.plot(x,gen1[1:])
-plt.plot(x,gen2[1:])
-plt.show()
+        write_csv(records, path)
+
+
+def plot(records: np.ndarray):
+    from matplotlib import pyplot as plt
+    for pair in np.unique(records["pair"]):
+        rows = records[records["pair"] == pair]
+        plt.plot(rows["date"], rows["close"], label=pair.decode())
+    plt.legend()
+    plt.show()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic training datasets.")
+    parser.add_argument("--candles", type=int, default=720, help="candles per pair")
+    parser.add_argument("--pairs", nargs="+", default=["USDT_BTC"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--regime", choices=sorted(REGIMES), default="default")
+    parser.add_argument("--start", type=int, default=1620550800, help="date of the first candle")
+    parser.add_argument("--interval", type=int, default=1800, help="seconds between candles")
+    overrides: Dict[str, type] = {"level": float, "trend": float, "trend_length": int,
+                                  "cycle": float, "cycle_period": int, "noise": float}
+    for key, kind in overrides.items():
+        parser.add_argument("--" + key.replace("_", "-"), type=kind, help="override the regime's " + key)
+    parser.add_argument("--output", default="training_set-new_set.csv", help=".csv or .npy file")
+    parser.add_argument("--plot", action="store_true", help="show the close series")
+    args = parser.parse_args()
+
+    records = generate(args.candles, args.pairs, args.seed, args.regime, args.start, args.interval,
+                       **{key: getattr(args, key) for key in overrides})
+    write(records, args.output)
+    print(f"{len(records)} candles -> {args.output}")
+    if args.plot:
+        plot(records)
+
+
+if __name__ == "__main__":
+    main()
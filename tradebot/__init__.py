@@ -0,0 +1,9 @@
+from .bot import Bot, DecisionScheduler, main, read_lines
+from .chart import Candle, CandleParser, Chart, Column
+from .indicators import (INDICATORS, Atr, BollingerBands, Donchian, Ema, Indicator, Macd, RollingExtremes, Rsi,
+                         SharedBollingerBands, SharedMacd, Sma, Stochastic, WilliamsR)
+from .log import log, setup_logging
+from .sizing import AtrSizing
+from .state import BotState, cash_currency, stacks_value
+from .strategy import STRATEGIES, Strategy, load_strategy
+from .timing import LatencyHistogram, TurnProfiler
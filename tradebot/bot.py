@@ -0,0 +1,213 @@
+import argparse
+import copy
+import logging
+import os
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple, Type
+
+from .log import log, setup_logging
+from .sizing import AtrSizing
+from .state import BotState, cash_currency, stacks_value
+from .strategy import STRATEGIES, Strategy, load_strategy
+from .timing import TurnProfiler
+
+
+def read_lines(fd: int, chunk_size: int = 1 << 16):
+    # os.read returns whatever is available instead of waiting for a full
+    # chunk, so a pending `action` line is handed over as soon as it arrives.
+    pending = b""
+    while True:
+        chunk = os.read(fd, chunk_size)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+class DecisionScheduler:
+    # Keeps the engine's time bank from running dry. The slowest of the recent
+    # decisions, times a safety factor, must fit in what is left of the bank;
+    # otherwise the strategy's cheaper fallback_action is used. The bank
+    # refills by time_per_move every turn, so full decisions resume once it
+    # has recovered.
+    def __init__(self, botState: BotState, window: int = 20, safety: float = 2.0):
+        self.botState = botState
+        self.current = "full"
+        self.costs = deque(maxlen=window)
+        self.safety = safety
+        self.started = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.costs.append((time.perf_counter() - self.started) * 1000)
+
+    def estimate(self) -> float:
+        return max(self.costs) * self.safety if self.costs else 0.0
+
+    def mode(self) -> str:
+        mode = "full" if self.estimate() < self.botState.timeBank else "fallback"
+        if mode != self.current:
+            log.warning("time bank at %s ms, decision mode %s", self.botState.timeBank, mode)
+            self.current = mode
+        return mode
+
+
+class Bot:
+    def __init__(self, strategy: Strategy, profiler: Optional[TurnProfiler] = None):
+        self.botState = BotState()
+        # `strategy` is the template copied for each traded pair.
+        self.strategy = strategy
+        self.strategies = {}
+        self.seen = {}
+        self.botState.indicatorSpecs.extend(self.strategy.indicators)
+        if self.strategy.sizing is not None:
+            self.botState.indicatorSpecs.extend(self.strategy.sizing.indicators)
+        self.scheduler = DecisionScheduler(self.botState)
+        self.profiler = profiler
+        self.commands = {
+            "settings": self.on_settings,
+            "update": self.on_update,
+            "action": self.on_action,
+        }
+
+    def run(self):
+        # The "parse" phase covers decoding, splitting and dispatching each
+        # line, not the wait for it on stdin.
+        for line in read_lines(sys.stdin.buffer.fileno()):
+            command, tmp = self.timed("parse", self.read, line)
+            if command is not None:
+                command(tmp)
+        if self.profiler is not None:
+            self.profiler.dump()
+
+    def timed(self, phase: str, function, *args):
+        if self.profiler is None:
+            return function(*args)
+        return self.profiler.time(phase, function, *args)
+
+    def read(self, line: bytes):
+        reading = line.decode().rstrip("\r")
+        if len(reading) == 0:
+            return None, None
+        log.debug("%s", reading)
+        return self.route(reading)
+
+    def route(self, info: str):
+        tmp = info.split(" ")
+        return self.commands.get(tmp[0]), tmp
+
+    def parse(self, info: str):
+        command, tmp = self.timed("parse", self.route, info)
+        if command is not None:
+            command(tmp)
+
+    def on_settings(self, tmp: List[str]):
+        self.botState.update_settings(tmp[1], tmp[2])
+
+    def on_update(self, tmp: List[str]):
+        if tmp[1] == "game":
+            if tmp[2] == "next_candles":
+                # CandleParser only stores the candles; indicators are timed
+                # on their own.
+                self.timed("update", self.botState.update_candles, tmp[3])
+                self.timed("indicators", self.update_indicators)
+            else:
+                self.timed("update", self.botState.update_game, tmp[2], tmp[3])
+
+    def on_action(self, tmp: List[str]):
+        if len(tmp) > 2:
+            self.botState.timeBank = int(tmp[2])
+        self.timed("action", self.trading_strategy)
+        if self.profiler is not None:
+            self.profiler.actions += 1
+            if self.profiler.every and self.profiler.actions % self.profiler.every == 0:
+                log.info("%s", self.profiler.summary())
+
+    def trading_strategy(self):
+        stacks = self.botState.stacks
+        log.info("position_value: %s", self.position_value())
+
+        # Cash committed by earlier orders of this turn is not offered again
+        # to the pairs that share the same base currency.
+        available = dict(stacks)
+        orders = []
+        for pair, action in self.timed("decision", self.decide_actions).items():
+            strategy = self.strategies[pair]
+            base, quote = pair.split("_")
+            if action == "buy":
+                amount = strategy.amount(self.botState, pair, action, available[base])
+                available[base] -= amount * self.botState.charts[pair].closes[-1]
+                orders.append(("buy", pair, amount))
+            elif action == "sell" and stacks[quote] > 0:
+                amount = strategy.amount(self.botState, pair, action, available[base])
+                orders.append(("sell", pair, amount))
+        self.timed("output", self.execute_trades, orders)
+
+    def position_value(self) -> float:
+        charts = self.botState.charts
+        closes = {pair: chart.closes[-1] for pair, chart in charts.items()}
+        return stacks_value(self.botState.stacks, closes, cash_currency(charts))
+
+    def update_indicators(self):
+        self.botState.update_indicators()
+        self.update_strategies()
+
+    def update_strategies(self):
+        # Each pair's strategy sees every candle of its chart exactly once.
+        for pair, chart in self.botState.charts.items():
+            strategy = self.strategies.get(pair)
+            if strategy is None:
+                strategy = self.strategies[pair] = copy.deepcopy(self.strategy)
+            for index in range(self.seen.get(pair, 0), len(chart.closes)):
+                strategy.on_candle(chart, index)
+            self.seen[pair] = len(chart.closes)
+
+    def decide_actions(self) -> Dict[str, str]:
+        # Every pair whose base stack can still afford an order is decided in
+        # one batch, timed as a whole by the scheduler.
+        stacks = self.botState.stacks
+        pairs = [pair for pair in self.botState.charts
+                 if stacks.get(pair.split("_")[0], 0) >= self.strategies[pair].min_cash]
+        mode = self.scheduler.mode()
+        if mode == "full":
+            self.scheduler.start()
+            actions = {pair: self.strategies[pair].decide(self.botState, pair) for pair in pairs}
+            self.scheduler.stop()
+            return actions
+        return {pair: self.strategies[pair].fallback_action(self.botState, pair) for pair in pairs}
+
+    def execute_trades(self, orders: List[Tuple[str, str, float]]):
+        if not orders:
+            print("no_moves", flush=True)
+        else:
+            print(";".join(f'{action} {pair} {amount:.8f}' for (action, pair, amount) in orders), flush=True)
+
+
+def main(default: Optional[Type[Strategy]] = None):
+    parser = argparse.ArgumentParser(description="Trading bot for the AI Bot Workspace engine.")
+    parser.add_argument("--strategy", help="strategy name (%s) or module:Class" % ", ".join(sorted(STRATEGIES)))
+    parser.add_argument("--debug", action="store_true", help="log input lines and strategy diagnostics")
+    parser.add_argument("--risk", type=float, help="size orders by ATR, risking this share of the equity per order")
+    parser.add_argument("--profile", metavar="PATH", help="write per-phase turn latency histograms here at match end")
+    parser.add_argument("--profile-every", type=int, default=0, metavar="N",
+                        help="also log a latency summary every N actions")
+    args = parser.parse_args()
+    setup_logging(logging.DEBUG if args.debug else logging.INFO)
+    if args.strategy:
+        strategy = load_strategy(args.strategy)
+    elif default is not None:
+        strategy = default
+    else:
+        strategy = load_strategy("bollinger")
+    profiler = TurnProfiler(args.profile, args.profile_every) if args.profile else None
+    instance = strategy()
+    if args.risk:
+        instance.sizing = AtrSizing(args.risk)
+    Bot(instance, profiler).run()
@@ -0,0 +1,279 @@
+from array import array
+from functools import lru_cache
+from itertools import accumulate
+from operator import mul
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from .indicators import INDICATORS, Indicator
+
+if TYPE_CHECKING:
+    from .state import BotState
+
+
+@lru_cache(maxsize=None)
+def candle_columns(format: Tuple[str, ...]) -> Dict[str, int]:
+    return {key: i for (i, key) in enumerate(format)}
+
+
+def lazy_field(key: str, convert):
+    slot = "_" + key
+
+    def decode(self):
+        value = getattr(self, slot)
+        if value is None:
+            value = convert(self._fields[self._columns[key]])
+            setattr(self, slot, value)
+        return value
+
+    return property(decode)
+
+
+class Candle:
+    # Slotted candle record. By default every field is decoded in __init__;
+    # with lazy=True the split candle string is kept and each field is
+    # converted on first access only, which only pays off for callers that
+    # read a few fields (Chart.add_candle reads them all).
+    __slots__ = ("pair", "_fields", "_columns", "_date", "_high", "_low", "_open", "_close", "_volume")
+
+    def __init__(self, format, intel, lazy=False):
+        columns = self._columns = candle_columns(tuple(format))
+        fields = intel.strip().split(",")
+        self.pair = fields[columns["pair"]] if "pair" in columns else None
+        if lazy:
+            self._fields = fields
+            self._date = self._high = self._low = self._open = self._close = self._volume = None
+        else:
+            self._fields = None
+            self._date = int(fields[columns["date"]])
+            self._high = float(fields[columns["high"]])
+            self._low = float(fields[columns["low"]])
+            self._open = float(fields[columns["open"]])
+            self._close = float(fields[columns["close"]])
+            self._volume = float(fields[columns["volume"]])
+
+    date = lazy_field("date", int)
+    high = lazy_field("high", float)
+    low = lazy_field("low", float)
+    open = lazy_field("open", float)
+    close = lazy_field("close", float)
+    volume = lazy_field("volume", float)
+
+    def __repr__(self):
+        return str(self.pair) + str(self.date) + str(self.close) + str(self.volume)
+
+
+class Column:
+    # Append-only numeric column over a preallocated array. Slices are
+    # zero-copy memoryviews of the filled part (usable with numpy.frombuffer).
+    # Growth copies into a new, doubled buffer so views taken earlier stay valid.
+    def __init__(self, typecode: str, capacity: int = 0):
+        self.data = array(typecode, bytes(max(capacity, 16) * array(typecode).itemsize))
+        self.length = 0
+
+    def reserve(self, size: int):
+        if size > len(self.data):
+            grown = array(self.data.typecode, bytes(max(size, 2 * len(self.data)) * self.data.itemsize))
+            grown[:self.length] = self.data[:self.length]
+            self.data = grown
+
+    def append(self, value):
+        if self.length == len(self.data):
+            self.reserve(self.length + 1)
+        self.data[self.length] = value
+        self.length += 1
+
+    def extend(self, values):
+        # One conversion and one slice copy for the whole batch.
+        if not (isinstance(values, array) and values.typecode == self.data.typecode):
+            values = array(self.data.typecode, values)
+        end = self.length + len(values)
+        self.reserve(end)
+        self.data[self.length:end] = values
+        self.length = end
+
+    def view(self) -> memoryview:
+        return memoryview(self.data)[:self.length]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view()[index]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("column index out of range")
+        return self.data[index]
+
+    def __iter__(self):
+        return iter(self.view())
+
+
+class CandleParser:
+    # Built once from `settings candle_format`. A next_candles payload is split
+    # into one flat list of fields, each column is taken out of it with a
+    # strided slice and converted in one pass, and every chart is extended
+    # once, without intermediate Candle objects. Indicators are left to
+    # BotState.update_indicators.
+    def __init__(self, format: List[str]):
+        self.width = len(format)
+        self.pair = format.index("pair")
+        self.columns = tuple(format.index(key) for key in ("date", "open", "high", "low", "close", "volume"))
+
+    def parse(self, payload: str, botState: "BotState") -> int:
+        width = self.width
+        fields = payload.replace(";", ",").split(",")
+        if len(fields) % width:
+            raise ValueError("next_candles fields do not match candle_format")
+        pairs = [pair.strip() for pair in fields[self.pair::width]]
+        order = list(dict.fromkeys(pairs))
+        if pairs == order * (len(pairs) // len(order)):
+            # The engine sends the pairs in the same order every date.
+            stride = width * len(order)
+            for row, pair in enumerate(order):
+                self.extend(botState.chart(pair), [fields[row * width + i::stride] for i in self.columns])
+        else:
+            starts = {}
+            for row, pair in enumerate(pairs):
+                starts.setdefault(pair, []).append(row * width)
+            for pair, rows in starts.items():
+                self.extend(botState.chart(pair), [[fields[start + i] for start in rows] for i in self.columns])
+        return int(fields[self.columns[0]])
+
+    def extend(self, chart: "Chart", columns: List[List[str]]):
+        # Lists convert faster than iterators and Column.extend copies them
+        # into the chart arrays in one go.
+        chart.extend_rows(list(map(int, columns[0])), *(list(map(float, column)) for column in columns[1:]))
+
+
+class Chart:
+    def __init__(self, capacity: int = 0):
+        self.dates = Column("q", capacity)
+        self.opens = Column("d", capacity)
+        self.highs = Column("d", capacity)
+        self.lows = Column("d", capacity)
+        self.closes = Column("d", capacity)
+        self.volumes = Column("d", capacity)
+        self.indicators = {}
+        # Number of candles already pushed to the indicators.
+        self.indexed = 0
+        # Prefix sums over the first i candles at index i, so any window sum
+        # is a difference of two entries. Closes are shifted by the first
+        # close to keep the sum of squares precise.
+        self.shift = 0.0
+        self.close_sums = Column("d", capacity + 1)
+        self.square_sums = Column("d", capacity + 1)
+        self.volume_sums = Column("d", capacity + 1)
+        self.value_sums = Column("d", capacity + 1)
+        for sums in (self.close_sums, self.square_sums, self.volume_sums, self.value_sums):
+            sums.append(0.0)
+
+    def add_candle(self, candle: Candle):
+        self.add_row(candle.date, candle.open, candle.high, candle.low, candle.close, candle.volume)
+
+    def add_row(self, date: int, open: float, high: float, low: float, close: float, volume: float):
+        self.append_row(date, open, high, low, close, volume)
+        self.update_indicators()
+
+    def append_row(self, date: int, open: float, high: float, low: float, close: float, volume: float):
+        # Only stores the candle; the indicators catch up on the next
+        # update_indicators or add_indicator call.
+        self.dates.append(date)
+        self.opens.append(open)
+        self.highs.append(high)
+        self.lows.append(low)
+        self.closes.append(close)
+        self.volumes.append(volume)
+        if len(self.closes) == 1:
+            self.shift = close
+        shifted = close - self.shift
+        self.close_sums.append(self.close_sums[-1] + shifted)
+        self.square_sums.append(self.square_sums[-1] + shifted * shifted)
+        self.volume_sums.append(self.volume_sums[-1] + volume)
+        self.value_sums.append(self.value_sums[-1] + close * volume)
+
+    def extend_rows(self, dates: Sequence[int], opens: Sequence[float], highs: Sequence[float],
+                    lows: Sequence[float], closes: Sequence[float], volumes: Sequence[float]):
+        # Bulk append_row: every column and prefix sum is extended once, with
+        # the same additions in the same order as one append_row per candle.
+        if not len(closes):
+            return
+        if not len(self.closes):
+            self.shift = closes[0]
+        shift = self.shift
+        self.dates.extend(dates)
+        self.opens.extend(opens)
+        self.highs.extend(highs)
+        self.lows.extend(lows)
+        self.closes.extend(closes)
+        self.volumes.extend(volumes)
+        shifted = [close - shift for close in closes]
+        self.close_sums.extend(list(accumulate(shifted, initial=self.close_sums[-1]))[1:])
+        self.square_sums.extend(list(accumulate(map(mul, shifted, shifted), initial=self.square_sums[-1]))[1:])
+        self.volume_sums.extend(list(accumulate(volumes, initial=self.volume_sums[-1]))[1:])
+        self.value_sums.extend(list(accumulate(map(mul, closes, volumes), initial=self.value_sums[-1]))[1:])
+
+    def update_indicators(self):
+        for index in range(self.indexed, len(self.closes)):
+            for indicator in self.indicators.values():
+                indicator.update(self, index)
+        self.indexed = len(self.closes)
+
+    def add_indicator(self, name: str, *params) -> Indicator:
+        if self.indexed < len(self.closes):
+            self.update_indicators()
+        key = (name,) + params
+        indicator = self.indicators.get(key)
+        if indicator is None:
+            indicator = INDICATORS[name](*params)
+            for index in range(len(self.closes)):
+                indicator.update(self, index)
+            self.indicators[key] = indicator
+        return indicator
+
+    def window(self, period: int, end: Optional[int] = None) -> Tuple[int, int]:
+        # The last `period` candles before `end` (default: all candles),
+        # clipped to the start of the chart.
+        if end is None:
+            end = len(self.closes)
+        return max(0, end - period), end
+
+    def close_sum(self, period: int, end: Optional[int] = None) -> float:
+        start, end = self.window(period, end)
+        return self.close_sums[end] - self.close_sums[start] + (end - start) * self.shift
+
+    def sma(self, period: int, end: Optional[int] = None) -> Optional[float]:
+        start, end = self.window(period, end)
+        if end == start:
+            return None
+        return (self.close_sums[end] - self.close_sums[start]) / (end - start) + self.shift
+
+    def variance(self, period: int, end: Optional[int] = None) -> Optional[float]:
+        # Population variance of the closes in the window.
+        start, end = self.window(period, end)
+        if end == start:
+            return None
+        mean = (self.close_sums[end] - self.close_sums[start]) / (end - start)
+        return max((self.square_sums[end] - self.square_sums[start]) / (end - start) - mean * mean, 0.0)
+
+    def vwap(self, period: int, end: Optional[int] = None) -> Optional[float]:
+        # Volume weighted average close of the window.
+        start, end = self.window(period, end)
+        volume = self.volume_sums[end] - self.volume_sums[start]
+        if volume <= 0:
+            return None
+        return (self.value_sums[end] - self.value_sums[start]) / volume
+
+    def indicator(self, name: str, *params) -> Indicator:
+        return self.indicators[(name,) + params]
+
+    def calculate_ema(self, period: int) -> array:
+        # Served from the cached ("ema", period) indicator, which only advances
+        # over candles appended since it was registered. The returned array is
+        # the live series, not a copy.
+        return self.add_indicator("ema", period).values
+
+    def ema(self, period: int) -> Optional[float]:
+        values = self.calculate_ema(period)
+        return values[-1] if values else None
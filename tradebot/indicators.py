@@ -0,0 +1,331 @@
+from array import array
+from collections import deque
+from typing import TYPE_CHECKING, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .chart import Chart
+
+
+class Indicator:
+    # Streaming indicators are fed one candle at a time by Chart.add_candle
+    # and keep their output series in compact arrays.
+    def __init__(self):
+        self.values = array("d")
+
+    def update(self, chart: "Chart", index: int):
+        self.push(chart.closes[index])
+
+    def push(self, value: float):
+        raise NotImplementedError
+
+    def ready(self) -> bool:
+        return len(self.values) > 0
+
+    def last(self) -> float:
+        return self.values[-1]
+
+
+class Sma(Indicator):
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+
+    def push(self, value: float):
+        self.window.append(value)
+        self.total += value
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+        if len(self.window) == self.period:
+            self.values.append(self.total / self.period)
+
+
+class Ema(Indicator):
+    # Seeded with the SMA of the first `period` values, like Chart.calculate_ema.
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.count = 0
+        self.seed = 0.0
+
+    def push(self, value: float):
+        if self.count < self.period:
+            self.count += 1
+            self.seed += value
+            if self.count == self.period:
+                self.values.append(self.seed / self.period)
+        else:
+            previous = self.values[-1]
+            self.values.append((value - previous) * self.multiplier + previous)
+
+
+class Macd(Indicator):
+    # `values` holds the MACD line; the signal line and histogram are aligned
+    # with its tail.
+    def __init__(self, fast_period: int, slow_period: int, signal_period: int):
+        super().__init__()
+        self.fast = Ema(fast_period)
+        self.slow = Ema(slow_period)
+        self.signal = Ema(signal_period)
+        self.histogram = array("d")
+
+    def push(self, value: float):
+        self.fast.push(value)
+        self.slow.push(value)
+        if self.slow.ready():
+            macd = self.fast.last() - self.slow.last()
+            self.values.append(macd)
+            self.signal.push(macd)
+            if self.signal.ready():
+                self.histogram.append(macd - self.signal.last())
+
+
+class BollingerBands(Indicator):
+    # Rolling mean and sum of squared deviations (Welford) over the newest
+    # `period` closes, so each update and each band query is O(1).
+    # `values` holds the middle band.
+    def __init__(self, period: int, std_multiplier: float):
+        super().__init__()
+        self.period = period
+        self.std_multiplier = std_multiplier
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.upper = array("d")
+        self.lower = array("d")
+
+    def push(self, value: float):
+        window = self.window
+        if len(window) < self.period:
+            window.append(value)
+            delta = value - self.mean
+            self.mean += delta / len(window)
+            self.m2 += delta * (value - self.mean)
+        else:
+            oldest = window.popleft()
+            window.append(value)
+            old_mean = self.mean
+            self.mean += (value - oldest) / self.period
+            self.m2 += (value - oldest) * (value - self.mean + oldest - old_mean)
+            if self.m2 < 0:
+                self.m2 = 0.0
+        if len(window) == self.period:
+            upper_band, lower_band = self.bands()
+            self.values.append(self.mean)
+            self.upper.append(upper_band)
+            self.lower.append(lower_band)
+
+    def std(self) -> float:
+        return (self.m2 / len(self.window)) ** 0.5
+
+    def bands(self) -> Tuple[float, float]:
+        std = self.std()
+        upper_band = self.mean + self.std_multiplier * std
+        lower_band = self.mean - self.std_multiplier * std
+        return upper_band, lower_band
+
+
+class Rsi(Indicator):
+    # Wilder RSI: only the two smoothed averages, the last close and the
+    # last RSI value are kept, so `values` stays empty for the whole match.
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self.count = 0
+        self.last_close = None
+        self.average_gain = 0.0
+        self.average_loss = 0.0
+        self.value = None
+
+    def push(self, value: float):
+        if self.last_close is None:
+            self.last_close = value
+            return
+        change = value - self.last_close
+        self.last_close = value
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if self.count < self.period:
+            self.count += 1
+            self.average_gain += gain / self.period
+            self.average_loss += loss / self.period
+            if self.count < self.period:
+                return
+        else:
+            self.average_gain = (self.average_gain * (self.period - 1) + gain) / self.period
+            self.average_loss = (self.average_loss * (self.period - 1) + loss) / self.period
+        if self.average_loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - 100 / (1 + self.average_gain / self.average_loss)
+
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def last(self) -> float:
+        return self.value
+
+
+class Atr(Indicator):
+    # Wilder average true range, seeded with the mean of the first `period`
+    # true ranges. Only the previous close and the running average are kept.
+    def __init__(self, period: int):
+        super().__init__()
+        self.period = period
+        self.count = 0
+        self.total = 0.0
+        self.previous_close = None
+
+    def update(self, chart: "Chart", index: int):
+        high, low = chart.highs[index], chart.lows[index]
+        if self.previous_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+        self.previous_close = chart.closes[index]
+        if self.count < self.period:
+            self.count += 1
+            self.total += true_range
+            if self.count == self.period:
+                self.values.append(self.total / self.period)
+        else:
+            self.values.append((self.values[-1] * (self.period - 1) + true_range) / self.period)
+
+
+class RollingExtremes:
+    # Highest high and lowest low of the newest `period` candles. Each deque
+    # keeps (index, value) pairs that can still become the extreme, so every
+    # candle is appended and popped at most once: amortized O(1) per update.
+    def __init__(self, period: int):
+        self.period = period
+        self.highs = deque()
+        self.lows = deque()
+        self.count = 0
+
+    def push(self, index: int, high: float, low: float):
+        highs = self.highs
+        while highs and highs[-1][1] <= high:
+            highs.pop()
+        highs.append((index, high))
+        if highs[0][0] <= index - self.period:
+            highs.popleft()
+        lows = self.lows
+        while lows and lows[-1][1] >= low:
+            lows.pop()
+        lows.append((index, low))
+        if lows[0][0] <= index - self.period:
+            lows.popleft()
+        self.count += 1
+
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def highest(self) -> float:
+        return self.highs[0][1]
+
+    def lowest(self) -> float:
+        return self.lows[0][1]
+
+
+class Donchian(Indicator):
+    # Donchian channel over `period` candles; `values` holds the middle line.
+    def __init__(self, period: int):
+        super().__init__()
+        self.extremes = RollingExtremes(period)
+        self.upper = array("d")
+        self.lower = array("d")
+
+    def update(self, chart: "Chart", index: int):
+        extremes = self.extremes
+        extremes.push(index, chart.highs[index], chart.lows[index])
+        if extremes.ready():
+            self.upper.append(extremes.highest())
+            self.lower.append(extremes.lowest())
+            self.values.append((extremes.highest() + extremes.lowest()) / 2)
+
+
+class Stochastic(Indicator):
+    # %K in `values`, %D (the `smooth`-candle SMA of %K) in `d`.
+    def __init__(self, period: int, smooth: int = 3):
+        super().__init__()
+        self.extremes = RollingExtremes(period)
+        self.smoothing = Sma(smooth)
+        self.d = self.smoothing.values
+
+    def update(self, chart: "Chart", index: int):
+        extremes = self.extremes
+        extremes.push(index, chart.highs[index], chart.lows[index])
+        if extremes.ready():
+            highest, lowest = extremes.highest(), extremes.lowest()
+            k = 100 * (chart.closes[index] - lowest) / (highest - lowest) if highest > lowest else 50.0
+            self.values.append(k)
+            self.smoothing.push(k)
+
+
+class WilliamsR(Indicator):
+    # Williams %R, from -100 (close at the lowest low) to 0 (at the highest high).
+    def __init__(self, period: int):
+        super().__init__()
+        self.extremes = RollingExtremes(period)
+
+    def update(self, chart: "Chart", index: int):
+        extremes = self.extremes
+        extremes.push(index, chart.highs[index], chart.lows[index])
+        if extremes.ready():
+            highest, lowest = extremes.highest(), extremes.lowest()
+            self.values.append(-100 * (highest - chart.closes[index]) / (highest - lowest)
+                               if highest > lowest else -50.0)
+
+
+class SharedBollingerBands(Indicator):
+    # Bollinger bands read from rolling mean and std series computed ahead of
+    # time for the whole dataset (see sweep.py), indexed by candle.
+    def __init__(self, means: Sequence[float], stds: Sequence[float], std_multiplier: float):
+        super().__init__()
+        self.means = means
+        self.stds = stds
+        self.std_multiplier = std_multiplier
+        self.index = -1
+
+    def update(self, chart: "Chart", index: int):
+        self.index = index
+
+    def std(self) -> float:
+        return self.stds[self.index]
+
+    def bands(self) -> Tuple[float, float]:
+        mean = self.means[self.index]
+        std = self.stds[self.index]
+        return mean + self.std_multiplier * std, mean - self.std_multiplier * std
+
+
+class SharedMacd(Indicator):
+    # MACD histogram computed ahead of time for the whole dataset, aligned
+    # with the candles; `histogram` only exposes the values known so far.
+    def __init__(self, histogram: Sequence[float], first: int):
+        super().__init__()
+        self.series = histogram
+        self.first = first
+        self.index = -1
+
+    def update(self, chart: "Chart", index: int):
+        self.index = index
+
+    @property
+    def histogram(self) -> Sequence[float]:
+        return self.series[self.first:max(self.first, self.index + 1)]
+
+
+INDICATORS = {
+    "sma": Sma,
+    "ema": Ema,
+    "macd": Macd,
+    "bollinger": BollingerBands,
+    "rsi": Rsi,
+    "atr": Atr,
+    "donchian": Donchian,
+    "stochastic": Stochastic,
+    "williams_r": WilliamsR,
+}
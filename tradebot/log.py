@@ -0,0 +1,23 @@
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+log = logging.getLogger("trade")
+
+
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    # Records are queued by the bot and written to stderr by a listener
+    # thread, so a slow or full stderr pipe never delays the stdout reply.
+    # The listener is drained at exit.
+    records = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    listener = QueueListener(records, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    log.addHandler(QueueHandler(records))
+    log.setLevel(level)
+    log.propagate = False
+    return listener
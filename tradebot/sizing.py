@@ -0,0 +1,39 @@
+import math
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    from .state import BotState
+
+
+class AtrSizing:
+    # Sizes orders so that a move of `stop` ATRs against the position, plus
+    # the fees of getting in and out, costs `risk` of the pair's equity (its
+    # base stack plus the quote stack at the last close). Buys are capped at
+    # `max_fraction` of the cash and sells at the quote stack. Until the ATR
+    # has `period` candles, or while it and the fees are zero, the strategy's
+    # fixed fraction is used instead.
+    def __init__(self, risk: float = 0.01, period: int = 14, stop: float = 2.0, max_fraction: float = 0.5):
+        self.risk = risk
+        self.period = period
+        self.stop = stop
+        self.max_fraction = max_fraction
+        self.indicators: List[Tuple] = [("atr", self.period)]
+
+    def amount(self, botState: "BotState", pair: str, action: str, cash: float, fraction: float) -> float:
+        chart = botState.charts[pair]
+        close = chart.closes[-1]
+        atr = chart.add_indicator("atr", self.period)
+        quote = botState.stacks.get(pair.split("_")[1], 0.0)
+        if not atr.ready():
+            return fraction * cash / close
+        fee = botState.transactionFee / 100
+        risked = self.stop * atr.last() + 2 * fee * close
+        if risked <= 0:
+            return fraction * cash / close
+        equity = cash + quote * close
+        amount = self.risk * equity / risked
+        if action == "buy":
+            return min(amount, self.max_fraction * cash / close)
+        # Stacks are reported and orders sent with 8 decimals, so a full exit
+        # stays one unit of the last decimal below the reported stack.
+        return min(amount, max(math.floor(quote * 1e8) - 1, 0) / 1e8)
@@ -0,0 +1,103 @@
+from typing import Dict, Iterable
+
+from .chart import Candle, CandleParser, Chart
+from .log import log
+
+
+def cash_currency(pairs: Iterable[str]) -> str:
+    # The currency the engine's stacks start in: a base currency that is not
+    # also traded as a quote (USDT for USDT_BTC, USDT_ETH and BTC_ETH).
+    pairs = list(pairs)
+    quotes = {pair.split("_")[1] for pair in pairs}
+    for pair in pairs:
+        base = pair.split("_")[0]
+        if base not in quotes:
+            return base
+    return pairs[0].split("_")[0]
+
+
+def stacks_value(stacks: Dict[str, float], closes: Dict[str, float], cash: str) -> float:
+    # Stacks valued in the cash currency through the last cash_* closes;
+    # currencies without such a pair are left out.
+    value = stacks.get(cash, 0.0)
+    for currency, amount in stacks.items():
+        close = closes.get(cash + "_" + currency)
+        if close is not None:
+            value += amount * close
+    return value
+
+
+class BotState:
+    def __init__(self):
+        self.timeBank = 0
+        self.maxTimeBank = 0
+        self.timePerMove = 1
+        self.candleInterval = 1
+        self.candleFormat = []
+        self.candlesTotal = 0
+        self.candlesGiven = 0
+        self.initialStack = 0
+        self.transactionFee = 0.1
+        self.date = 0
+        self.stacks = dict()
+        self.charts = dict()
+        self.indicatorSpecs = []
+        self.candleParser = None
+
+    def chart(self, pair: str) -> Chart:
+        if not (pair in self.charts):
+            self.charts[pair] = Chart(self.candlesTotal)
+            for spec in self.indicatorSpecs:
+                self.charts[pair].add_indicator(*spec)
+        return self.charts[pair]
+
+    def update_chart(self, pair: str, new_candle_str: str):
+        new_candle_obj = Candle(self.candleFormat, new_candle_str)
+        self.chart(pair).add_candle(new_candle_obj)
+
+    def update_stack(self, key: str, value: float):
+        self.stacks[key] = value
+
+    def update_settings(self, key: str, value: str):
+        if key == "timebank":
+            self.maxTimeBank = int(value)
+            self.timeBank = int(value)
+        if key == "time_per_move":
+            self.timePerMove = int(value)
+        if key == "candle_interval":
+            self.candleInterval = int(value)
+        if key == "candle_format":
+            self.candleFormat = value.split(",")
+            self.candleParser = CandleParser(self.candleFormat)
+        if key == "candles_total":
+            self.candlesTotal = int(value)
+        if key == "candles_given":
+            self.candlesGiven = int(value)
+        if key == "initial_stack":
+            self.initialStack = int(value)
+        if key == "transaction_fee_percent":
+            self.transactionFee = float(value)
+
+    def update_game(self, key: str, value: str):
+        # New candles are only stored here, update_indicators feeds them to
+        # the chart indicators.
+        if key == "next_candles":
+            self.update_candles(value)
+        if key == "stacks":
+            new_stacks = value.split(",")
+            for stack_str in new_stacks:
+                stack_infos = stack_str.strip().split(":")
+                self.update_stack(stack_infos[0], float(stack_infos[1]))
+
+    def update_candles(self, value: str):
+        self.date = self.candleParser.parse(value, self)
+
+    def update_indicators(self):
+        for chart in self.charts.values():
+            chart.update_indicators()
+
+    def Rsi(self, pair: str = "USDT_BTC", period: int = 5) -> bool:
+        rsi = self.charts[pair].add_indicator("rsi", period)
+        log.debug("Average gain is %s", rsi.average_gain)
+        log.debug("Average loss is %s", rsi.average_loss)
+        return rsi.average_gain > rsi.average_loss
@@ -0,0 +1,65 @@
+import importlib
+import importlib.util
+import os
+from typing import TYPE_CHECKING, List, Optional, Tuple, Type
+
+if TYPE_CHECKING:
+    from .chart import Chart
+    from .sizing import AtrSizing
+    from .state import BotState
+
+# Strategies shipped with the repo, by the name given to --strategy.
+STRATEGIES = {
+    "bollinger": "trade:TradingStrategy",
+    "bollinger_ema": "other_bots.trade_bollinger2:TradingStrategy",
+    "bollinger_macd": "other_bots.trade_bollinger_macd:TradingStrategy",
+    "buy": "other_bots.trade_example:BuyStrategy",
+    "alternate": "other_bots.trade_example2:TradingStrategy",
+    "moving_average": "other_bots.trade_example3:TradingStrategy",
+    "trend_following": "other_bots.trade_example4:TrendFollowingStrategy",
+    "momentum": "other_bots.trade_example_with_sell:MomentumStrategy",
+    "macd": "other_bots.trade_macd:MacdStrategy",
+    "rsi": "other_bots.trade_rsi:RsiStrategy",
+}
+
+
+class Strategy:
+    # A strategy instance trades a single pair: Bot copies the configured
+    # strategy for every pair, feeds it each new candle of that pair through
+    # on_candle and asks decide for "buy", "sell" or "no_moves" on each action.
+    # Orders are sized by amount, a fixed fraction of the cash unless a
+    # sizing (e.g. AtrSizing) is set; pairs whose base stack is below
+    # min_cash are not asked at all. When the time bank runs low the
+    # scheduler asks fallback_action instead: no_moves unless a strategy has
+    # a cheaper rule that goes through the same guards as decide.
+    indicators: List[Tuple] = []
+    fraction = 0.2
+    min_cash = 100
+    sizing: Optional["AtrSizing"] = None
+
+    def on_candle(self, chart: "Chart", index: int):
+        pass
+
+    def decide(self, botState: "BotState", pair: str) -> str:
+        raise NotImplementedError
+
+    def fallback_action(self, botState: "BotState", pair: str) -> str:
+        return "no_moves"
+
+    def amount(self, botState: "BotState", pair: str, action: str, cash: float) -> float:
+        if self.sizing is not None:
+            return self.sizing.amount(botState, pair, action, cash, self.fraction)
+        return self.fraction * cash / botState.charts[pair].closes[-1]
+
+
+def load_strategy(name: str) -> Type[Strategy]:
+    # `name` is a key of STRATEGIES, "module:Class" or "path/to/file.py:Class".
+    target = STRATEGIES.get(name, name)
+    module_name, _, class_name = target.rpartition(":")
+    if module_name.endswith(".py"):
+        spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(module_name))[0], module_name)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(module_name)
+    return getattr(module, class_name)
@@ -0,0 +1,102 @@
+import json
+import time
+from array import array
+from typing import Dict
+
+# Latencies are counted in whole microseconds. Values below 16 us get a bucket
+# each; above that every power of two is split into 8 buckets, so a bucket is
+# at most 12.5% wide and 288 buckets reach past 2^36 us.
+SUB_BUCKETS = 8
+BUCKETS = 16 + 34 * SUB_BUCKETS
+
+
+def bucket_index(micros: int) -> int:
+    if micros < 16:
+        return max(micros, 0)
+    shift = micros.bit_length() - 4
+    return min(16 + (shift - 1) * SUB_BUCKETS + (micros >> shift) - SUB_BUCKETS, BUCKETS - 1)
+
+
+def bucket_floor(index: int) -> int:
+    if index < 16:
+        return index
+    shift, sub = divmod(index - 16, SUB_BUCKETS)
+    return (sub + SUB_BUCKETS) << (shift + 1)
+
+
+class LatencyHistogram:
+    # Fixed-bucket HDR-style histogram: recording is O(1) and the memory
+    # stays the same however long the match is.
+    def __init__(self):
+        self.counts = array("q", bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bucket_index(int(seconds * 1e6))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> int:
+        # Lower bound, in microseconds, of the bucket holding the q-th percentile.
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bucket_floor(index)
+        return 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_us": self.total * 1e6,
+            "max_us": self.max * 1e6,
+            "p50_us": self.percentile(50),
+            "p90_us": self.percentile(90),
+            "p99_us": self.percentile(99),
+            "p999_us": self.percentile(99.9),
+            "buckets": [[bucket_floor(index), count] for index, count in enumerate(self.counts) if count],
+        }
+
+
+class TurnProfiler:
+    # Wall and CPU time of each phase of a turn (parse, update, indicators,
+    # decision, output, and the whole action), dumped as JSON to `output` at
+    # the end of the match. CPU time is the bot thread's own, so the logging
+    # thread does not count.
+    PHASES = ("parse", "update", "indicators", "decision", "output", "action")
+
+    def __init__(self, output: str, every: int = 0):
+        self.output = output
+        self.every = every
+        self.actions = 0
+        self.wall = {phase: LatencyHistogram() for phase in self.PHASES}
+        self.cpu = {phase: LatencyHistogram() for phase in self.PHASES}
+
+    def time(self, phase: str, function, *args):
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        result = function(*args)
+        self.cpu[phase].record(time.thread_time() - cpu)
+        self.wall[phase].record(time.perf_counter() - wall)
+        return result
+
+    def summary(self) -> str:
+        parts = [f"{phase} p50 {self.wall[phase].percentile(50)} p99 {self.wall[phase].percentile(99)} "
+                 f"max {self.wall[phase].max * 1e6:.0f}" for phase in self.PHASES if self.wall[phase].count]
+        return f"turn latency (us) after {self.actions} actions: " + ", ".join(parts)
+
+    def to_dict(self) -> Dict:
+        return {
+            "actions": self.actions,
+            "phases": {phase: {"wall": self.wall[phase].to_dict(), "cpu": self.cpu[phase].to_dict()}
+                       for phase in self.PHASES},
+        }
+
+    def dump(self):
+        with open(self.output, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
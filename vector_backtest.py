@@ -0,0 +1,144 @@
+import argparse
+import time
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+import dataset
+
+BUY = 1
+SELL = -1
+
+
+class VectorResult(NamedTuple):
+    final_value: float
+    trades: int
+    rejected: int
+    equity: np.ndarray
+
+
+def load_columns(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    records = dataset.load(path)
+    return tuple(np.ascontiguousarray(records[key]) for key in ("date", "high", "low", "close", "volume"))
+
+
+def rolling_mean_std(closes: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Cumulative sums over prices shifted by their first value keep the
+    # sum-of-squares term small enough for float64. Entries before the first
+    # full window are NaN.
+    shifted = closes - closes[0]
+    sums = np.concatenate(([0.0], np.cumsum(shifted)))
+    squares = np.concatenate(([0.0], np.cumsum(shifted * shifted)))
+    mean = np.full(len(closes), np.nan)
+    std = np.full(len(closes), np.nan)
+    window_mean = (sums[period:] - sums[:-period]) / period
+    variance = (squares[period:] - squares[:-period]) / period - window_mean ** 2
+    mean[period - 1:] = window_mean + closes[0]
+    std[period - 1:] = np.sqrt(np.maximum(variance, 0.0))
+    return mean, std
+
+
+def bollinger_signals(closes: np.ndarray, period: int = 20, std_multiplier: float = 2.0) -> np.ndarray:
+    # TradingStrategy.decide_action: buy below the lower band, sell above the
+    # upper band, once more than `period` closes are known.
+    mean, std = rolling_mean_std(closes, period)
+    signals = np.zeros(len(closes), dtype=np.int8)
+    signals[closes < mean - std_multiplier * std] = BUY
+    signals[closes > mean + std_multiplier * std] = SELL
+    signals[:period] = 0
+    return signals
+
+
+def crossover_signals(closes: np.ndarray, short_period: int = 10, long_period: int = 50) -> np.ndarray:
+    # TrendFollowingStrategy.decide_action: buy while the short SMA is above
+    # the long one, sell otherwise.
+    short_ma, _ = rolling_mean_std(closes, short_period)
+    long_ma, _ = rolling_mean_std(closes, long_period)
+    signals = np.where(short_ma > long_ma, BUY, SELL).astype(np.int8)
+    signals[:long_period - 1] = 0
+    return signals
+
+
+def signal_changes(signals: np.ndarray) -> np.ndarray:
+    # Indexes where a signal differs from the previous non-zero signal. Since
+    # strategies only act when the signal differs from their previous action,
+    # every other index is a no-op and can be skipped.
+    nonzero = np.flatnonzero(signals)
+    values = signals[nonzero]
+    keep = np.ones(len(nonzero), dtype=bool)
+    keep[1:] = values[1:] != values[:-1]
+    return nonzero[keep]
+
+
+def run(closes: np.ndarray, signals: np.ndarray, candles_given: int = 336, initial_stack: float = 1000,
+        fee_percent: float = 0.2, fraction: float = 0.2, min_cash: float = 100,
+        sell_requires_position: bool = True) -> VectorResult:
+    # Mirrors Bot.trading_strategy: no decision while cash is below min_cash,
+    # orders are `fraction` of what the cash can buy, and a strategy only acts
+    # when its signal differs from its previous action. Only signal changes
+    # are visited, the equity curve is then filled in with array operations.
+    fee = fee_percent / 100
+    first = max(1, min(candles_given, len(closes))) - 1
+    events = signal_changes(signals[first:]) + first
+    cash, position = float(initial_stack), 0.0
+    previous = 0
+    trades = rejected = 0
+    changed_at, cash_after, position_after = [], [], []
+
+    for i in events.tolist():
+        if cash < min_cash or signals[i] == previous:
+            continue
+        previous = signals[i]
+        price = closes[i]
+        amount = fraction * cash / price
+        if previous == BUY:
+            cash -= amount * price
+            position += amount * (1 - fee)
+        elif sell_requires_position and position <= 0:
+            continue
+        elif amount > position:
+            rejected += 1
+            continue
+        else:
+            position -= amount
+            cash += amount * price * (1 - fee)
+        trades += 1
+        changed_at.append(i)
+        cash_after.append(cash)
+        position_after.append(position)
+
+    slot = np.searchsorted(np.array(changed_at, dtype=np.int64), np.arange(len(closes)), side="right")
+    cash_curve = np.concatenate(([float(initial_stack)], cash_after))[slot]
+    position_curve = np.concatenate(([0.0], position_after))[slot]
+    equity = cash_curve + position_curve * closes
+    return VectorResult(float(equity[-1]), trades, rejected, equity)
+
+
+STRATEGIES = {
+    "bollinger": bollinger_signals,
+    "crossover": crossover_signals,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized backtest of a signal strategy over a training dataset.")
+    parser.add_argument("dataset", nargs="+", help="training CSV file(s)")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="bollinger")
+    parser.add_argument("--given", type=int, default=336, help="candles given before the first action")
+    parser.add_argument("--stack", type=float, default=1000, help="initial stack in the base currency")
+    parser.add_argument("--fee", type=float, default=0.2, help="transaction fee percent")
+    parser.add_argument("--fraction", type=float, default=0.2, help="share of affordable amount per order")
+    args = parser.parse_args()
+
+    for path in args.dataset:
+        closes = load_columns(path)[3]
+        started = time.perf_counter()
+        signals = STRATEGIES[args.strategy](closes)
+        result = run(closes, signals, args.given, args.stack, args.fee, args.fraction)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{path}: value {result.final_value:.2f} trades {result.trades} rejected {result.rejected} "
+              f"({elapsed:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
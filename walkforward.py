@@ -0,0 +1,93 @@
+import argparse
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from backtest import Backtest, load_bot, load_dataset
+from sweep import SPACES, grid
+
+backtests = {}
+
+
+def windows(turns: int, given: int, in_sample: int, out_of_sample: int, step: int) -> List[Tuple[int, int, int]]:
+    # (start, in-sample end, out-of-sample end) turn indexes. The first window
+    # trades from the last given candle, like a match does.
+    start = max(1, min(given, turns)) - 1
+    result = []
+    while start + in_sample + out_of_sample <= turns:
+        result.append((start, start + in_sample, start + in_sample + out_of_sample))
+        start += step
+    return result
+
+
+def walk(strategy: str, params: Dict[str, float], path: str, spans: List[Tuple[int, int, int]],
+         fee: float) -> List[Tuple[float, int, float, int]]:
+    # A single bot is fed the dataset once, front to back. At every window
+    # boundary it is copied with its charts and indicators already warmed up,
+    # and the copy trades the in-sample or out-of-sample slice, so overlapping
+    # windows never recompute the history they share.
+    if path not in backtests:
+        format, rows = load_dataset(path)
+        backtests[path] = Backtest(format, rows, fee_percent=fee)
+    backtest = backtests[path]
+
+    ends = {}
+    for start, middle, end in spans:
+        ends.setdefault(start, set()).add(middle)
+        ends.setdefault(middle, set()).add(end)
+
+    bot = load_bot(strategy, **params)
+    fed = min(ends) + 1
+    backtest.start(bot, fed)
+    results = {}
+    for turn in sorted(ends):
+        backtest.feed(bot, fed, turn + 1)
+        fed = turn + 1
+        for end in sorted(ends[turn]):
+            results[(turn, end)] = backtest.trade(copy.deepcopy(bot), turn, end)
+
+    return [(results[(start, middle)].final_value, results[(start, middle)].trades,
+             results[(middle, end)].final_value, results[(middle, end)].trades) for start, middle, end in spans]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of strategy parameters.")
+    parser.add_argument("dataset", help="training CSV or .npy file")
+    parser.add_argument("--strategy", choices=sorted(SPACES), default="bollinger")
+    parser.add_argument("--given", type=int, default=336, help="candles given before the first window")
+    parser.add_argument("--in-sample", type=int, default=192, help="candles each parameter set is tuned on")
+    parser.add_argument("--out-of-sample", type=int, default=48, help="candles the chosen parameters are tested on")
+    parser.add_argument("--step", type=int, help="candles between window starts, default the out-of-sample size")
+    parser.add_argument("--fee", type=float, default=0.2, help="transaction fee percent")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    backtest = Backtest(*load_dataset(args.dataset))
+    turns = len(backtest.turns)
+    spans = windows(turns, args.given, args.in_sample, args.out_of_sample, args.step or args.out_of_sample)
+    if not spans:
+        parser.error(f"{turns} candles are not enough for one window after {args.given} given")
+    points = grid(SPACES[args.strategy])
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        futures = [pool.submit(walk, args.strategy, params, args.dataset, spans, args.fee) for params in points]
+        results = [future.result() for future in futures]
+
+    stack = backtest.initial_stack
+    compounded = 1.0
+    print(f"{'in-sample':>11} {'out-of-sample':>13} {'IS %':>7} {'OOS %':>7} {'trades':>6}  parameters")
+    for i, (start, middle, end) in enumerate(spans):
+        best = max(range(len(points)), key=lambda j: results[j][i][0])
+        in_value, _, out_value, out_trades = results[best][i]
+        compounded *= out_value / stack
+        print(f"{start:>5}-{middle:<5} {middle:>6}-{end:<6} {(in_value / stack - 1) * 100:7.2f} "
+              f"{(out_value / stack - 1) * 100:7.2f} {out_trades:6}  {points[best]}")
+    print(f"{len(spans)} windows x {len(points)} parameter sets in {time.perf_counter() - started:.1f}s, "
+          f"compounded out-of-sample return {(compounded - 1) * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    main()